@@ -0,0 +1,93 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import nihTB_cli
+
+# Measures how long each command takes to start. For every command two things are timed,
+# both through the same launcher (the python script, or the frozen exe given with --exe):
+#   help -> 'run_nihTB <command> --help' (argument parsing only, goal is under 1 second)
+#   run  -> the command run against an empty study folder. This loads everything the stage
+#           needs (pandas etc.) but has no data to process, so it is the cold start cost
+# Pass '--exe path/to/run_nihTB.exe' to time a frozen build instead of 'python run_nihTB.py'.
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+HELP_GOAL_SECONDS = 1.0
+
+
+def time_command(cmd, repeats, check=True):
+    # Returns the run times in seconds for 'repeats' fresh processes
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=SCRIPT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=check)
+        times.append(time.perf_counter() - start)
+    return times
+
+def time_empty_study_run(launcher, command, repeats):
+    # Each run gets a fresh empty study folder so no saved state carries over between runs.
+    # Stages that need input files exit non-zero here, which is expected
+    times = []
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as study_dir:
+            if command == 'batch':
+                cmd = launcher + [command, study_dir, '--summary', os.path.join(study_dir, 'batch_summary.csv')]
+            else:
+                cmd = launcher + [command, '--root', study_dir]
+            times += time_command(cmd, 1, check=False)
+    return times
+
+def benchmark(launcher, repeats):
+    results = []
+    for command in nihTB_cli.COMMANDS:
+        help_times = time_command(launcher + [command, '--help'], repeats)
+        run_times = time_empty_study_run(launcher, command, repeats)
+
+        results.append({
+            'command': command,
+            'help_first': help_times[0],
+            'help_median': statistics.median(help_times),
+            'run_first': run_times[0],
+            'run_median': statistics.median(run_times),
+        })
+    return results
+
+def print_report(results, label):
+    # label names the binary that was timed ('python' or 'exe') in every column header
+    headers = [f'{label} --help (1st)', f'{label} --help (median)', f'{label} run (1st)', f'{label} run (median)']
+    width = max(len(h) for h in headers) + 2
+    print(f"\n{'Command':<12}" + "".join(f"{h:>{width}}" for h in headers) + "   Goal")
+    print("-" * (12 + width * len(headers) + 7))
+    for r in results:
+        status = 'OK' if r['help_median'] < HELP_GOAL_SECONDS else 'SLOW'
+        values = [r['help_first'], r['help_median'], r['run_first'], r['run_median']]
+        print(f"{r['command']:<12}" + "".join(f"{v:>{width - 1}.3f}s" for v in values) + f"   {status}")
+    print(f"\n'run' = the command on an empty study folder (cold start, no data). --help goal: under {HELP_GOAL_SECONDS:.0f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time start up of each run_nihTB command.')
+    parser.add_argument('--exe', help='Path to a frozen run_nihTB executable to time instead of the python script')
+    parser.add_argument('--repeats', type=int, default=5, help='Runs per measurement (default: 5)')
+    args = parser.parse_args(argv)
+
+    if args.exe:
+        launcher = [os.path.abspath(args.exe)]
+        label = 'exe'
+    else:
+        launcher = [sys.executable, os.path.join(SCRIPT_DIR, 'run_nihTB.py')]
+        label = 'python'
+
+    print(f"Timing start up for [{label}]: {' '.join(launcher)} ({args.repeats} runs each)")
+    results = benchmark(launcher, args.repeats)
+    print_report(results, label)
+
+    if any(r['help_median'] >= HELP_GOAL_SECONDS for r in results):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import argparse
+
+# Command line definitions for every stage. Only argparse is imported here so that
+# '--help' can be answered without loading pandas, matplotlib or the stage scripts.
+
+# command name -> (module that runs it, one line description)
+COMMANDS = {
+    'organize': ('run_nihTB_organization', "Combine 'ScoresExport*.csv'/'ItemExport*.csv' files in datadump/ and split them by subject"),
+    'verify': ('run_nihTB_verify', "Check each subject's CSV files against the master files"),
+    'analyze': ('run_nihTB_analysis', "Error/missing row reports, histograms and descriptives for each task"),
+    'ndaformat': ('run_nihTB_ndaFormat', "Create an NDA formatted CSV from MASTER_SCORES-NIHTB.csv"),
+    'batch': ('run_nihTB_batch', "Run organize, verify, analyze and ndaformat for several study roots in parallel"),
+}
+
+# Commands run by 'batch' for each study root, in order
+BATCH_STAGES = ['organize', 'verify', 'analyze', 'ndaformat']
+
+
+####################################
+##### Stage specific arguments #####
+####################################
+
+def _positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a whole number")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be 1 or more (got {number})")
+    return number
+
+def _add_root_argument(parser):
+    parser.add_argument('--root', default='.',
+                        help="Study folder containing datadump/ (and the NDA data dictionary). Default: current folder")
+
+def _add_analyze_options(parser):
+    parser.add_argument('--rebuild-stats', action='store_true',
+                        help='Ignore the saved statistics state and rebuild it exactly from the master file')
+    parser.add_argument('--check-stats', action='store_true',
+                        help='Compare the saved quartile sketches against exact quantiles from the master file')
+    parser.add_argument('--no-plots', action='store_true',
+                        help='Write descriptives only. Skips histograms (and loading matplotlib/seaborn)')
+
+def _add_analyze_arguments(parser):
+    _add_root_argument(parser)
+    _add_analyze_options(parser)
+
+def _add_batch_arguments(parser):
+    parser.add_argument('roots', nargs='+',
+                        help='Study folders, each with its own datadump/ and DataDictionary_NIHTB-COGNITION.csv')
+    parser.add_argument('--workers', type=_positive_int, default=None,
+                        help='Maximum number of studies processed at the same time. Default: number of CPUs')
+    parser.add_argument('--summary', default='batch_summary.csv',
+                        help='Where to write the per-study summary CSV. Default: batch_summary.csv')
+    _add_analyze_options(parser)
+
+ARGUMENT_BUILDERS = {
+    'organize': _add_root_argument,
+    'verify': _add_root_argument,
+    'analyze': _add_analyze_arguments,
+    'ndaformat': _add_root_argument,
+    'batch': _add_batch_arguments,
+}
+
+
+###################
+##### Parsers #####
+###################
+
+def add_command_arguments(command, parser):
+    builder = ARGUMENT_BUILDERS.get(command)
+    if builder:
+        builder(parser)
+    return parser
+
+def parse_command_args(command, argv=None):
+    # Used by the individual run_nihTB_*.py scripts when they are run on their own
+    parser = argparse.ArgumentParser(description=COMMANDS[command][1])
+    add_command_arguments(command, parser)
+    return parser.parse_args(argv)
+
+def build_parser():
+    # Parser for the combined 'run_nihTB.py' entry point
+    parser = argparse.ArgumentParser(
+        prog='run_nihTB',
+        description='NIH Toolbox Cognition data organizer. Run one of the commands below.'
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+
+    for command, (_, description) in COMMANDS.items():
+        sub = subparsers.add_parser(command, help=description, description=description)
+        add_command_arguments(command, sub)
+
+    return parser
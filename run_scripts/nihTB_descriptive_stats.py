@@ -0,0 +1,391 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+import math
+import bisect
+
+# Persisted descriptive statistics for each (InstrumentTitle, variable) pair.
+# The state is folded forward with only the rows that are new to the master file,
+# so adding a participant does not require recomputing every task from scratch.
+
+STATE_FILENAME = 'descriptive_stats_state.json'
+ROW_HASHES_FILENAME = 'descriptive_stats_rows.npy'  # sorted uint64 hash of every row already included
+STATE_VERSION = 3
+
+# Quantile sketch size. While a variable has this many valid values or fewer, every value
+# is kept as its own centroid and the quartiles match pandas describe() exactly.
+SKETCH_COMPRESSION = 200
+
+DESCRIBE_QUANTILES = [0.25, 0.5, 0.75]
+
+
+###########################
+##### Quantile Sketch #####
+###########################
+
+def new_sketch(compression=SKETCH_COMPRESSION):
+    return {'compression': compression, 'centroids': []}
+
+def _compress_centroids(means, counts, compression):
+    # Merging t-digest style compression (k1 scale). means must be sorted. Each centroid is
+    # assigned to a bucket by k(q) = compression / pi * asin(2q - 1) at its midpoint rank q,
+    # and centroids in the same bucket are merged. Buckets are narrow in the tails and wide
+    # near the median, which keeps the quartiles accurate with about `compression` centroids
+    total = counts.sum()
+    q = (np.cumsum(counts) - counts / 2) / total
+    buckets = np.floor(compression / np.pi * np.arcsin(2 * q - 1)).astype(np.int64)
+
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    merged_counts = np.add.reduceat(counts, starts)
+    merged_means = np.add.reduceat(means * counts, starts) / merged_counts
+    return merged_means, merged_counts
+
+def sketch_from_sorted(values, compression=SKETCH_COMPRESSION):
+    # Builds a sketch from a sorted numpy array of finite values in one vectorized pass
+    means = np.asarray(values, dtype=float)
+    counts = np.ones(len(means), dtype=np.int64)
+
+    if len(means) > compression:
+        means, counts = _compress_centroids(means, counts, compression)
+
+    return {'compression': compression, 'centroids': [[m, int(c)] for m, c in zip(means.tolist(), counts.tolist())]}
+
+def sketch_add(sketch, values):
+    # values: unsorted array of finite floats. Cost is proportional to the number of new
+    # values plus the (small) number of centroids already held
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return sketch
+
+    held = np.asarray(sketch['centroids'], dtype=float).reshape(-1, 2)
+    means = np.concatenate([held[:, 0], values])
+    counts = np.concatenate([held[:, 1].astype(np.int64), np.ones(len(values), dtype=np.int64)])
+    order = np.argsort(means, kind='stable')
+    means, counts = means[order], counts[order]
+
+    if len(means) > sketch['compression']:
+        means, counts = _compress_centroids(means, counts, sketch['compression'])
+
+    sketch['centroids'] = [[m, int(c)] for m, c in zip(means.tolist(), counts.tolist())]
+    return sketch
+
+def sketch_quantile(sketch, q, min_value, max_value):
+    # Uses the same rule as pandas' default 'linear' interpolation: the target position is
+    # (n - 1) * q and a centroid of size c is centred at rank (values before it) + (c - 1) / 2.
+    # With singleton centroids this reduces to the exact quantile
+    centroids = sketch['centroids']
+    if not centroids:
+        return np.nan
+
+    total = sum(c for _, c in centroids)
+    positions = [0.0]
+    values = [min_value]
+    seen = 0
+    for mean, count in centroids:
+        positions.append(seen + (count - 1) / 2)
+        values.append(mean)
+        seen += count
+    positions.append(total - 1.0)
+    values.append(max_value)
+
+    target = (total - 1) * q
+    i = bisect.bisect_left(positions, target)
+    if i == 0:
+        return values[0]
+    if i >= len(positions):
+        return values[-1]
+    if positions[i] == target:
+        return values[i]
+
+    left_pos, right_pos = positions[i - 1], positions[i]
+    frac = (target - left_pos) / (right_pos - left_pos)
+    return values[i - 1] + (values[i] - values[i - 1]) * frac
+
+
+##############################
+##### Running Statistics #####
+##############################
+
+def new_variable_stats():
+    return {
+        'total': 0,       # all rows for the task, valid or not
+        'count': 0,       # valid numeric values
+        'missing': 0,     # NaN / non-numeric / inf
+        'mean': 0.0,
+        'm2': 0.0,        # sum of squared deviations from the mean (Welford)
+        'min': None,
+        'max': None,
+        'sketch': new_sketch(),
+    }
+
+def clean_numeric(series_raw):
+    # Same cleaning that analyze_instruments applies before describe()
+    series_numeric = pd.to_numeric(series_raw, errors='coerce')  ## Force Numeric
+    return series_numeric.replace([np.inf, -np.inf], np.nan)
+
+def update_variable_stats(stats, values):
+    # Fold a batch of cleaned float values (NaN = missing) into the running statistics.
+    # Batch mean/M2 are combined with the stored ones using Chan et al.'s parallel update
+    values = np.asarray(values, dtype=float)
+    clean = values[~np.isnan(values)]
+
+    stats['total'] += len(values)
+    stats['missing'] += len(values) - len(clean)
+
+    n_b = len(clean)
+    if n_b == 0:
+        return stats
+
+    mean_b = float(clean.mean())
+    m2_b = float(((clean - mean_b) ** 2).sum())
+
+    n_a = stats['count']
+    n = n_a + n_b
+    delta = mean_b - stats['mean']
+    stats['mean'] = stats['mean'] + delta * n_b / n
+    stats['m2'] = stats['m2'] + m2_b + delta * delta * n_a * n_b / n
+    stats['count'] = n
+
+    batch_min = float(clean.min())
+    batch_max = float(clean.max())
+    stats['min'] = batch_min if stats['min'] is None else min(stats['min'], batch_min)
+    stats['max'] = batch_max if stats['max'] is None else max(stats['max'], batch_max)
+
+    sketch_add(stats['sketch'], clean)
+    return stats
+
+def describe_from_stats(stats):
+    # Returns a Series laid out like pandas Series.describe() for numeric data
+    n = stats['count']
+    std = math.sqrt(stats['m2'] / (n - 1)) if n > 1 else np.nan
+    quartiles = [sketch_quantile(stats['sketch'], q, stats['min'], stats['max']) for q in DESCRIBE_QUANTILES]
+
+    return pd.Series(
+        [float(n), stats['mean'], std, stats['min']] + quartiles + [stats['max']],
+        index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+        dtype=float
+    )
+
+
+##################################
+##### State Load/Save/Update #####
+##################################
+
+def new_state(task_col=None, variables=(), columns=()):
+    # task_col/variables/columns record what the state was built for, so a change in
+    # SCORE_VARIABLES or in which of them exist in the master file forces a rebuild
+    return {
+        'version': STATE_VERSION,
+        'task_col': task_col,
+        'variables': sorted(variables),
+        'columns': sorted(columns),
+        'row_hashes': np.empty(0, dtype=np.uint64),
+        'stats': {}
+    }
+
+def _tracked_columns(df, variables):
+    return sorted(v for v in variables if v in df.columns)
+
+def load_state(output_dir):
+    state_path = os.path.join(output_dir, STATE_FILENAME)
+    hashes_path = os.path.join(output_dir, ROW_HASHES_FILENAME)
+    if not os.path.exists(state_path) or not os.path.exists(hashes_path):
+        return None
+
+    try:
+        with open(state_path, 'r') as f:
+            state = json.load(f)
+        row_hashes = np.load(hashes_path)
+    except (OSError, ValueError) as e:
+        print(f"  [!] Could not read {STATE_FILENAME}, statistics will be rebuilt: {e}")
+        return None
+
+    if state.get('version') != STATE_VERSION:
+        print(f"  [!] {STATE_FILENAME} is from an older version, statistics will be rebuilt.")
+        return None
+
+    state['row_hashes'] = row_hashes
+    return state
+
+def save_state(state, output_dir):
+    # Statistics go to JSON, the (large) row hashes to a binary .npy file next to it
+    os.makedirs(output_dir, exist_ok=True)
+    state_path = os.path.join(output_dir, STATE_FILENAME)
+    hashes_path = os.path.join(output_dir, ROW_HASHES_FILENAME)
+
+    with open(hashes_path + '.tmp', 'wb') as f:
+        np.save(f, state['row_hashes'])
+    with open(state_path + '.tmp', 'w') as f:
+        f.write(json.dumps({k: v for k, v in state.items() if k != 'row_hashes'}))
+
+    os.replace(hashes_path + '.tmp', hashes_path)
+    os.replace(state_path + '.tmp', state_path)
+
+def clean_frame(df, task_col, columns):
+    # Task column plus the tracked score columns as clean floats. Only these are hashed, so
+    # other columns changing (or an int column becoming float because a new row has a blank)
+    # does not make old rows look different
+    cleaned = pd.DataFrame({task_col: df[task_col].astype(str)}, index=df.index)
+    for col in columns:
+        cleaned[col] = clean_numeric(df[col]).astype(float)
+    return cleaned
+
+def hash_rows(cleaned):
+    # One 64-bit hash per row so rows already folded into the state can be recognised
+    return pd.util.hash_pandas_object(cleaned, index=False).to_numpy(dtype=np.uint64)
+
+def _fold_rows(state, cleaned, task_col, columns):
+    # Incremental path: Chan update per (task, variable) for a small batch of new rows
+    stats = state['stats']
+    for instrument, subset in cleaned.groupby(task_col, sort=False):
+        inst_stats = stats.setdefault(str(instrument), {})
+        for var in columns:
+            var_stats = inst_stats.setdefault(var, new_variable_stats())
+            update_variable_stats(var_stats, subset[var].to_numpy())
+
+def rebuild_state(df, task_col, variables):
+    # Exact rebuild from the full master file. Counts, mean, variance, min and max come from
+    # one grouped aggregation and each sketch is seeded from sorted values in numpy
+    columns = _tracked_columns(df, variables)
+    state = new_state(task_col, variables, columns)
+
+    cleaned = clean_frame(df[df[task_col].notna()], task_col, columns)
+    state['row_hashes'] = np.sort(hash_rows(clean_frame(df, task_col, columns)))
+    if cleaned.empty or not columns:
+        return state
+
+    grouped = cleaned.groupby(task_col, sort=False)
+    totals = grouped.size()
+    agg = grouped[columns].agg(['count', 'mean', 'var', 'min', 'max'])
+
+    for instrument, subset in grouped:
+        inst_stats = state['stats'].setdefault(str(instrument), {})
+        row = agg.loc[instrument]
+        total = int(totals[instrument])
+
+        for var in columns:
+            count = int(row[(var, 'count')])
+            var_stats = new_variable_stats()
+            var_stats.update({'total': total, 'count': count, 'missing': total - count})
+
+            if count > 0:
+                values = subset[var].to_numpy()
+                values = np.sort(values[~np.isnan(values)])
+                var_stats.update({
+                    'mean': float(row[(var, 'mean')]),
+                    'm2': float(row[(var, 'var')]) * (count - 1) if count > 1 else 0.0,
+                    'min': float(row[(var, 'min')]),
+                    'max': float(row[(var, 'max')]),
+                    'sketch': sketch_from_sorted(values),
+                })
+            inst_stats[var] = var_stats
+
+    return state
+
+def _find_new_rows(saved_hashes, row_hashes):
+    # Compares rows as multisets of hashes. Returns a boolean mask of rows that are new (the
+    # copies of each hash beyond the number already saved), or None if any saved row is gone
+    order = np.argsort(row_hashes, kind='stable')
+    sorted_hashes = row_hashes[order]
+
+    starts = np.flatnonzero(np.r_[True, sorted_hashes[1:] != sorted_hashes[:-1]])
+    unique_hashes = sorted_hashes[starts]
+    unique_counts = np.diff(np.r_[starts, len(sorted_hashes)])
+
+    saved_unique, saved_counts = np.unique(saved_hashes, return_counts=True)
+    pos = np.searchsorted(unique_hashes, saved_unique)
+    found = pos < len(unique_hashes)
+    found[found] = unique_hashes[pos[found]] == saved_unique[found]
+    if not found.all() or (unique_counts[pos] < saved_counts).any():
+        return None
+
+    already = np.zeros(len(unique_hashes), dtype=np.int64)
+    already[pos] = saved_counts
+    group = np.repeat(np.arange(len(unique_hashes)), unique_counts)
+    rank = np.arange(len(sorted_hashes)) - starts[group]
+
+    is_new = np.empty(len(row_hashes), dtype=bool)
+    is_new[order] = rank >= already[group]
+    return is_new
+
+def update_state(state, df, task_col, variables):
+    # Fold only rows not seen before. If rows have disappeared from the master file (or their
+    # scores changed so they hash differently) the running values cannot be taken back,
+    # so the state is rebuilt from source instead.
+    if state is None:
+        print("  - No saved statistics found. Building from master file...")
+        return rebuild_state(df, task_col, variables)
+
+    columns = _tracked_columns(df, variables)
+    if (state.get('task_col') != task_col or state.get('variables') != sorted(variables)
+            or state.get('columns') != columns):
+        print("  - Score variables or columns changed since the last run. Rebuilding statistics...")
+        return rebuild_state(df, task_col, variables)
+
+    cleaned = clean_frame(df, task_col, columns)
+    row_hashes = hash_rows(cleaned)
+
+    if len(row_hashes) == 0:
+        is_new = np.zeros(0, dtype=bool) if len(state['row_hashes']) == 0 else None
+    else:
+        is_new = _find_new_rows(state['row_hashes'], row_hashes)
+
+    if is_new is None:
+        print("  - Rows were removed or changed since the last run. Rebuilding statistics...")
+        return rebuild_state(df, task_col, variables)
+
+    delta = cleaned[is_new & df[task_col].notna().to_numpy()]
+    print(f"  - Updating statistics with {int(is_new.sum())} new rows ({len(df) - int(is_new.sum())} already included).")
+
+    if not delta.empty:
+        _fold_rows(state, delta, task_col, columns)
+    state['row_hashes'] = np.sort(row_hashes)
+    return state
+
+
+###########################
+##### Sketch Checking #####
+###########################
+
+def check_sketch_quantiles(state, df, task_col, variables, output_dir=None):
+    # Compares the sketch quartiles with exact quantiles computed from the master file
+    rows = []
+    for instrument, subset in df.groupby(task_col):
+        inst_stats = state['stats'].get(str(instrument), {})
+        for var in variables:
+            if var not in inst_stats:
+                continue
+            var_stats = inst_stats[var]
+            clean_series = clean_numeric(subset[var]).dropna()
+            if clean_series.empty:
+                continue
+
+            exact = clean_series.quantile(DESCRIBE_QUANTILES)
+            for q in DESCRIBE_QUANTILES:
+                approx = sketch_quantile(var_stats['sketch'], q, var_stats['min'], var_stats['max'])
+                rows.append({
+                    'InstrumentTitle': instrument,
+                    'Variable': var,
+                    'Quantile': q,
+                    'Exact': exact[q],
+                    'Sketch': approx,
+                    'Abs_Error': abs(approx - exact[q]),
+                    'Centroids': len(var_stats['sketch']['centroids']),
+                    'Valid_N': var_stats['count']
+                })
+
+    check_df = pd.DataFrame(rows)
+    if check_df.empty:
+        print(" -> No statistics to check.")
+        return check_df
+
+    n_exact = int((check_df['Abs_Error'] <= 1e-9).sum())
+    print(f" -> {n_exact} of {len(check_df)} sketch quartiles match the exact values. "
+          f"Largest difference: {check_df['Abs_Error'].max():.6g}")
+
+    if output_dir:
+        out_path = os.path.join(output_dir, 'descriptive_stats_sketch_check.csv')
+        check_df.to_csv(out_path, index=False)
+        print(f" -> See '{os.path.basename(out_path)}'.")
+    return check_df
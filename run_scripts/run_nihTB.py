@@ -0,0 +1,31 @@
+import sys
+import importlib
+import multiprocessing
+import nihTB_cli
+
+# Combined entry point for all stages, e.g.:
+#   python run_nihTB.py organize
+#   python run_nihTB.py analyze --no-plots
+# Only the module for the requested command is imported, so '--help' and light
+# commands do not pay for pandas/matplotlib/seaborn imports they do not use.
+
+def main(argv=None):
+    parser = nihTB_cli.build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        parser.print_help()
+        return 1
+
+    module_name = nihTB_cli.COMMANDS[args.command][0]
+    stage = importlib.import_module(module_name)
+    result = stage.run(args)
+
+    # Stages return None when they could not finish; batch reports failed studies
+    if result is None or result.get('failed_studies'):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # needed by 'batch' when running from a frozen exe
+    sys.exit(main())
@@ -1,10 +1,7 @@
 import pandas as pd
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
-import numpy as np
+import nihTB_descriptive_stats as dstats
+import nihTB_cli
 
 ################################
 ##### Paths and task names #####
@@ -59,6 +56,15 @@ REASON_MAP = {1: 'Environmental', 2: 'Cognitive', 3: 'Physical', 4: 'Language',
 ##### Secondary Functions #####
 ###############################
 
+def load_plotting():
+    # matplotlib/seaborn are slow to import (especially from a frozen exe), so they are only
+    # loaded once the first histogram is drawn
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    return plt, sns
+
 def load_data(path):
     if not os.path.exists(path):
         raise FileNotFoundError(f"The file '{path}' was not found.")
@@ -160,11 +166,15 @@ def generate_missing_row_report(df, output_dir):
 ##### Main function #####
 #########################
 
-def analyze_instruments(df, output_dir):
+def analyze_instruments(df, output_dir, stats_state=None, make_plots=True):
     if TASK_COL not in df.columns:
         print(f"Error: Column '{TASK_COL}' not found.")
         return
 
+    # Descriptives are written from the running statistics state. Without one, build it from df
+    if stats_state is None:
+        stats_state = dstats.rebuild_state(df, TASK_COL, SCORE_VARIABLES)
+
     # All unique tasks, even v3.1 vs no v3.1 
     all_tasks = df[TASK_COL].dropna().unique()
     
@@ -172,6 +182,8 @@ def analyze_instruments(df, output_dir):
 
     print(f"Found {len(all_tasks)} unique tasks.")
 
+    plt, sns = None, None
+
     for instrument in all_tasks:
         subset = df[df[TASK_COL] == instrument]
         
@@ -195,25 +207,22 @@ def analyze_instruments(df, output_dir):
                     continue
 
                 
-                series_raw = subset[var]
-                series_numeric = pd.to_numeric(series_raw, errors='coerce') ## Force Numeric
-                series_numeric = series_numeric.replace([np.inf, -np.inf], np.nan)
-                
-                nan_count = series_numeric.isna().sum()
-                clean_series = series_numeric.dropna()
+                var_stats = stats_state['stats'].get(str(instrument), {}).get(var, dstats.new_variable_stats())
                 
-                valid_count = len(clean_series)
-                total_rows = len(subset)
+                nan_count = var_stats['missing']
+                valid_count = var_stats['count']
+                total_rows = var_stats['total']
 
                 # Write Stats
                 f.write(f"Variable: {var}\n")
                 f.write(f"  > Total Rows:    {total_rows}\n")
-                f.write(f"  > Valid Data:    {valid_count} ({(valid_count/total_rows)*100:.1f}%)\n")
+                valid_pct = (valid_count/total_rows)*100 if total_rows else 0.0
+                f.write(f"  > Valid Data:    {valid_count} ({valid_pct:.1f}%)\n")
                 f.write(f"  > Missing/NaN:   {nan_count}\n")
                 
                 if valid_count > 0:
                     f.write("\n  [Descriptives of Valid Data]\n")
-                    desc = clean_series.describe().to_string().replace('\n', '\n    ')
+                    desc = dstats.describe_from_stats(var_stats).to_string().replace('\n', '\n    ')
                     f.write(f"    {desc}")
                 else:
                     f.write("  [No valid data to calculate statistics]")
@@ -221,7 +230,10 @@ def analyze_instruments(df, output_dir):
                 f.write("\n" + "-"*30 + "\n")
 
                 # Plotting
-                if valid_count > 1 and clean_series.nunique() > 1:
+                if make_plots and valid_count > 1 and var_stats['min'] != var_stats['max']:
+                    if plt is None:
+                        plt, sns = load_plotting()
+                    clean_series = dstats.clean_numeric(subset[var]).dropna()
                     try:
                         plt.figure(figsize=(10, 6))
                         sns.histplot(clean_series, kde=True, color='skyblue')
@@ -241,22 +253,46 @@ def analyze_instruments(df, output_dir):
 ##### Execution #####
 #####################
 
-if __name__ == "__main__":
-    os.makedirs(OUTPUT_BASE, exist_ok=True)
+def run(args):
+    # Paths are relative to the study root (current directory by default)
+    csv_path = os.path.join(args.root, CSV_PATH)
+    output_base = os.path.join(args.root, OUTPUT_BASE)
+    os.makedirs(output_base, exist_ok=True)
     
     try:
-        main_df = load_data(CSV_PATH)
+        main_df = load_data(csv_path)
+
+        # Update running descriptive statistics with rows new since the last run
+        print("Updating descriptive statistics state...")
+        if args.rebuild_stats:
+            stats_state = dstats.rebuild_state(main_df, TASK_COL, SCORE_VARIABLES)
+        else:
+            stats_state = dstats.update_state(dstats.load_state(output_base), main_df, TASK_COL, SCORE_VARIABLES)
+        dstats.save_state(stats_state, output_base)
+
+        if args.check_stats:
+            print("Checking quartile sketches against exact quantiles...")
+            dstats.check_sketch_quantiles(stats_state, main_df, TASK_COL, SCORE_VARIABLES, output_base)
         
         # Generate Missing Row Report
-        generate_missing_row_report(main_df, OUTPUT_BASE)
+        generate_missing_row_report(main_df, output_base)
 
         # Generate Error Report 
-        generate_error_summary(main_df, OUTPUT_BASE)
+        generate_error_summary(main_df, output_base)
         
         # Analyze Instruments 
-        analyze_instruments(main_df, OUTPUT_BASE)
+        analyze_instruments(main_df, output_base, stats_state, make_plots=not args.no_plots)
         
         print("\nScript has finished successfully.")
+        return {'analyzed_rows': len(main_df)}
         
     except Exception as e:
-        print(f"\n Error: {e}")
\ No newline at end of file
+        print(f"\n Error: {e}")
+        return None
+
+def main(argv=None):
+    args = nihTB_cli.parse_command_args('analyze', argv)
+    run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import argparse
+import contextlib
+import csv
+import importlib
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import nihTB_cli
+
+# Runs organize -> verify -> analyze -> ndaformat for several study roots at once.
+# Each study root is a folder laid out like a single study run (datadump/, and
+# DataDictionary_NIHTB-COGNITION.csv for NDA formatting). Every study runs in its own
+# worker process and writes its console output to LOG_FILENAME inside the study root.
+
+LOG_FILENAME = 'nihTB_batch_log.txt'
+
+SUMMARY_COLUMNS = [
+    'root', 'status', 'failed_stage', 'error',
+    'scores_rows', 'items_rows', 'verified_scores_subjects', 'verified_items_subjects',
+    'mismatched_scores_subjects', 'mismatched_items_subjects', 'analyzed_rows', 'nda_rows',
+    'organize_seconds', 'verify_seconds', 'analyze_seconds', 'ndaformat_seconds', 'total_seconds',
+]
+
+
+###############################
+##### Secondary Functions #####
+###############################
+
+def run_study(root, options):
+    # Runs every stage for one study root (inside a worker process). Stops at the first stage
+    # that fails, since later stages read the files that earlier stages write
+    result = {'root': root, 'status': 'ok', 'failed_stage': '', 'error': ''}
+    study_start = time.perf_counter()
+
+    if not os.path.isdir(root):
+        result.update({'status': 'failed', 'error': 'Study folder not found'})
+        return result
+
+    log_path = os.path.join(root, LOG_FILENAME)
+    with open(log_path, 'w') as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        for command in nihTB_cli.BATCH_STAGES:
+            print(f"\n##### {command} #####")
+            stage_args = argparse.Namespace(root=root, **options)
+
+            stage_start = time.perf_counter()
+            error = ''
+            try:
+                stage = importlib.import_module(nihTB_cli.COMMANDS[command][0])
+                counts = stage.run(stage_args)
+            except Exception as e:
+                traceback.print_exc()
+                counts = None
+                error = f"{type(e).__name__}: {e}"
+            result[f'{command}_seconds'] = round(time.perf_counter() - stage_start, 2)
+
+            if counts is None:
+                result.update({
+                    'status': 'failed',
+                    'failed_stage': command,
+                    'error': error or f"{command} did not finish. See {LOG_FILENAME}"
+                })
+                break
+            result.update(counts)
+
+    if result['status'] == 'ok' and (result.get('mismatched_scores_subjects') or result.get('mismatched_items_subjects')):
+        result['status'] = 'mismatch'
+
+    result['total_seconds'] = round(time.perf_counter() - study_start, 2)
+    return result
+
+def write_summary(results, summary_path):
+    summary_dir = os.path.dirname(summary_path)
+    if summary_dir:
+        os.makedirs(summary_dir, exist_ok=True)
+
+    with open(summary_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+
+def print_summary(results):
+    print(f"\n{'Status':<10}{'Scores':>9}{'Items':>10}{'NDA':>7}{'Seconds':>10}   Study")
+    print("-" * 70)
+    for r in results:
+        print(f"{r['status']:<10}{r.get('scores_rows', ''):>9}{r.get('items_rows', ''):>10}"
+              f"{r.get('nda_rows', ''):>7}{r.get('total_seconds', ''):>10}   {r['root']}")
+        if r['error']:
+            print(f"{'':<10}! {r['failed_stage'] or 'setup'}: {r['error']}")
+
+
+#########################
+##### Main function #####
+#########################
+
+def run(args):
+    # Same folder given twice would have two workers writing the same files, so roots are de-duplicated
+    roots = list(dict.fromkeys(os.path.abspath(r) for r in args.roots))
+    workers = args.workers if args.workers is not None else min(len(roots), os.cpu_count() or 1)
+    options = {'rebuild_stats': args.rebuild_stats, 'check_stats': args.check_stats, 'no_plots': args.no_plots}
+
+    print(f"\n Processing {len(roots)} studies with up to {workers} at a time...")
+    batch_start = time.perf_counter()
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_study, root, options): root for root in roots}
+        for future in as_completed(futures):
+            root = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # Worker process died (e.g. out of memory) before returning a result
+                result = {'root': root, 'status': 'failed', 'failed_stage': '', 'error': f"{type(e).__name__}: {e}"}
+            print(f"  - [{result['status']}] {root}")
+            results.append(result)
+
+    # Report studies in the order they were given
+    results.sort(key=lambda r: roots.index(r['root']))
+
+    print_summary(results)
+    write_summary(results, args.summary)
+
+    n_failed = sum(r['status'] != 'ok' for r in results)
+    print(f"\n {len(results) - n_failed} of {len(results)} studies completed without problems "
+          f"in {time.perf_counter() - batch_start:.1f}s. Summary saved to: {args.summary}")
+    print(f" Output from each study is in its '{LOG_FILENAME}'.")
+    return {'studies': len(results), 'failed_studies': n_failed}
+
+def main(argv=None):
+    args = nihTB_cli.parse_command_args('batch', argv)
+    result = run(args)
+    return 1 if result['failed_studies'] else 0
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
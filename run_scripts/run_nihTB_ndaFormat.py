@@ -2,6 +2,7 @@ import pandas as pd
 import re
 from pathlib import Path
 import numpy as np
+import nihTB_cli
 
 BASE_DIR = Path('.') # Current directory
 INPUT_DATA_PATH = BASE_DIR / 'processed_subject_data/MASTER_SCORES-NIHTB.csv'
@@ -46,13 +47,13 @@ VISIT_LABEL_MAP = {
 #### Secondary Functions ####
 #############################
 
-def load_data():
-    if not INPUT_DATA_PATH.exists():
-        print(f"[ERROR] Input file not found: {INPUT_DATA_PATH}")
+def load_data(input_path=INPUT_DATA_PATH, dict_path=DICT_PATH):
+    if not input_path.exists():
+        print(f"[ERROR] Input file not found: {input_path}")
         return None, None
     
-    df_data = pd.read_csv(INPUT_DATA_PATH, low_memory=False)
-    df_dict = pd.read_csv(DICT_PATH)
+    df_data = pd.read_csv(input_path, low_memory=False)
+    df_dict = pd.read_csv(dict_path)
     return df_data, df_dict
 
 def clean_instrument_name(full_def_str):
@@ -111,9 +112,13 @@ def standardize_visit_labels(df):
 ########################
 #### MAIN EXECUTION ####
 ########################
-def main():    
-    df_data, df_dict = load_data()
-    if df_data is None: return
+def run(args):    
+    # Paths are relative to the study root (current directory by default)
+    root = Path(args.root)
+    output_path = root / OUTPUT_PATH
+
+    df_data, df_dict = load_data(root / INPUT_DATA_PATH, root / DICT_PATH)
+    if df_data is None: return None
 
     # Use standardize label function 
     df_data, visit_col = standardize_visit_labels(df_data)
@@ -238,10 +243,15 @@ def main():
     #Keep blank cells blank and don't let them convert to NaN for proper NDA formatting 
     final_df = final_df[final_cols].fillna("")
     
-    final_df.to_csv(OUTPUT_PATH, index=False)
-    print(f"\n NDA formatted CSV created and placed in: {OUTPUT_PATH}")
+    final_df.to_csv(output_path, index=False)
+    print(f"\n NDA formatted CSV created and placed in: {output_path}")
     print(f"  - Total rows included in NDA formatted CSV: {len(final_df)}")
     print(f"  - Total variables included in NDA formatted CSV: {len(final_df.columns)}")
+    return {'nda_rows': len(final_df)}
+
+def main(argv=None):
+    args = nihTB_cli.parse_command_args('ndaformat', argv)
+    run(args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,37 +1,48 @@
 import nihTB_data_processing_functions as nih  
+import nihTB_cli
+import os
 
 RAW_DATA_DIR = 'datadump' 
 OUTPUT_DIR = 'processed_subject_data'
 
-def main():
+def run(args):
+    # Paths are relative to the study root (current directory by default)
+    raw_data_dir = os.path.join(args.root, RAW_DATA_DIR)
+    output_dir = os.path.join(args.root, OUTPUT_DIR)
+
     # Process ScoresExport csv files 
     print("\n Processing ScoresExport Files...")
-    scores_df = nih.load_data_by_pattern(RAW_DATA_DIR, 'ScoresExport*.csv')
+    scores_df = nih.load_data_by_pattern(raw_data_dir, 'ScoresExport*.csv')
     
     if not scores_df.empty:
         # Save master scores file 
-        nih.save_master_file(scores_df, OUTPUT_DIR, "MASTER_SCORES-NIHTB.csv")
+        nih.save_master_file(scores_df, output_dir, "MASTER_SCORES-NIHTB.csv")
         
         # split _scores by subject for individual folders
-        nih.split_into_subject_folders(scores_df, OUTPUT_DIR, "_scores.csv")
+        nih.split_into_subject_folders(scores_df, output_dir, "_scores.csv")
     else:
         print("  - No summary dcore data found. Moving to ItemExport files.")
 
 
     # Process ItemExport csv files
     print("\n Processing ItemExport Files...")
-    items_df = nih.load_data_by_pattern(RAW_DATA_DIR, 'ItemExport*.csv')
+    items_df = nih.load_data_by_pattern(raw_data_dir, 'ItemExport*.csv')
     
     if not items_df.empty:
         # Save master ItemExport file. Can be quite large.
-        nih.save_master_file(items_df, OUTPUT_DIR, "MASTER_ITEMS-NIHTB.csv")
+        nih.save_master_file(items_df, output_dir, "MASTER_ITEMS-NIHTB.csv")
         
         # Split _items.csv by Subject
-        nih.split_into_subject_folders(items_df, OUTPUT_DIR, "_items.csv")
+        nih.split_into_subject_folders(items_df, output_dir, "_items.csv")
     else:
         print("  - No trial buy trial data found.")
         
     print("\n **DATA PROCESSING COMPLETE**")
+    return {'scores_rows': len(scores_df), 'items_rows': len(items_df)}
+
+def main(argv=None):
+    args = nihTB_cli.parse_command_args('organize', argv)
+    run(args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,17 +1,20 @@
 import pandas as pd
 import pandas.testing as pdt
 import os
+import nihTB_cli
 
 # Match OUTPUT_DIR here with OUTPUT_DIR in 'run_nihTB_organization.py' script 
 OUTPUT_DIR = 'processed_subject_data' 
 
-def verify_dataset(master_filename, suffix, id_col='PID'):
+def verify_dataset(master_filename, suffix, id_col='PID', output_dir=OUTPUT_DIR):
+    # Returns (checked, mismatched) subject counts, None if there is no master file to check,
+    # or False if the master file exists but could not be read
     print(f"\n--- Verifying {master_filename} against individual *{suffix} files ---")
     
-    master_path = os.path.join(OUTPUT_DIR, master_filename)
+    master_path = os.path.join(output_dir, master_filename)
     if not os.path.exists(master_path):
         print(f"  [Skipping] Master file not found: {master_filename}")
-        return
+        return None
 
     print(f"  - Loading Master File...")
     # Read master file
@@ -19,12 +22,12 @@ def verify_dataset(master_filename, suffix, id_col='PID'):
         df_master = pd.read_csv(master_path, low_memory=False)
     except Exception as e:
         print(f"  [Error] Could not read master file: {e}")
-        return
+        return False
 
     # Standardize PID column for matching
     df_master['match_id'] = df_master[id_col].astype(str).str.strip()
     
-    subject_dirs = [d for d in os.listdir(OUTPUT_DIR) if os.path.isdir(os.path.join(OUTPUT_DIR, d))]
+    subject_dirs = [d for d in os.listdir(output_dir) if os.path.isdir(os.path.join(output_dir, d))]
     
     checked_count = 0
     errors = []
@@ -33,7 +36,7 @@ def verify_dataset(master_filename, suffix, id_col='PID'):
 
     for subj_id in subject_dirs:
         subj_file_name = f"{subj_id}{suffix}"
-        subj_file_path = os.path.join(OUTPUT_DIR, subj_id, subj_file_name)
+        subj_file_path = os.path.join(output_dir, subj_id, subj_file_name)
         
         if not os.path.exists(subj_file_path):
             continue
@@ -92,10 +95,32 @@ def verify_dataset(master_filename, suffix, id_col='PID'):
             print(f"    ! {e}")
         if len(errors) > 5:
             print(f"    ... and {len(errors)-5} more.")
-def main():
-    verify_dataset('MASTER_SCORES-NIHTB.csv', '_scores.csv')
 
-    verify_dataset('MASTER_ITEMS-NIHTB.csv', '_items.csv')
+    return checked_count, len(errors)
+
+def run(args):
+    output_dir = os.path.join(args.root, OUTPUT_DIR)
+    counts = {}
+    read_failed = False
+
+    # Scores and items are reported separately since each subject has one file of each
+    for label, master_filename, suffix in [('scores', 'MASTER_SCORES-NIHTB.csv', '_scores.csv'), ('items', 'MASTER_ITEMS-NIHTB.csv', '_items.csv')]:
+        result = verify_dataset(master_filename, suffix, output_dir=output_dir)
+        if result is False:
+            read_failed = True
+            continue
+        verified, mismatched = result or (0, 0)
+        counts[f'verified_{label}_subjects'] = verified
+        counts[f'mismatched_{label}_subjects'] = mismatched
+
+    # An unreadable master file counts as a failed verify stage
+    if read_failed:
+        return None
+    return counts
+
+def main(argv=None):
+    args = nihTB_cli.parse_command_args('verify', argv)
+    run(args)
 
 if __name__ == "__main__":
     main()